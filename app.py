@@ -1,70 +1,301 @@
-from flask import Flask, request, jsonify
-import requests
+from flask import Flask, request, jsonify, stream_with_context
+from flask.json.provider import JSONProvider
+from flask_compress import Compress
+import httpx
+from google.api_core.exceptions import PreconditionFailed
 from google.cloud import storage
-import json
+from google.cloud.storage.retry import DEFAULT_RETRY
+import hashlib
+import io
+import math
+import orjson
 import os
-from datetime import datetime
+import re
+import uuid
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, wait
+from dataclasses import dataclass
+from datetime import datetime, date, timedelta
 import logging
+from cachetools import TTLCache
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+
+@dataclass(frozen=True)
+class Config:
+    """Service settings read once from environment variables"""
+    bucket_name: str = 'weather-data-bucket'
+    # Mock all GCS operations (local development)
+    development_mode: bool = False
+    # Fall back to mocked GCS if the client cannot be created
+    mock_gcs: bool = False
+    max_batch_size: int = 100
+    # Large payloads use chunked resumable uploads; very large ones are uploaded as
+    # parallel parts and composed into the final object (mirrors gsutil's heuristic)
+    gcs_multipart_threshold: int = 8 * 1024 * 1024
+    gcs_multipart_chunk_size: int = 8 * 1024 * 1024
+    gcs_composite_threshold: int = 150 * 1024 * 1024
+    gcs_composite_max_workers: int = 10
+    # Files larger than this are streamed to the client instead of parsed in memory
+    stream_content_threshold: int = 8 * 1024 * 1024
+
+    @classmethod
+    def from_env(cls):
+        """Build the configuration from environment variables, using defaults when unset"""
+        defaults = cls()
+        return cls(
+            bucket_name=os.environ.get('GCS_BUCKET_NAME', defaults.bucket_name),
+            development_mode=os.environ.get('DEVELOPMENT_MODE') == 'true',
+            mock_gcs=os.environ.get('MOCK_GCS') == 'true',
+            max_batch_size=int(os.environ.get('MAX_BATCH_SIZE', defaults.max_batch_size)),
+            gcs_multipart_threshold=int(os.environ.get('GCS_MULTIPART_THRESHOLD', defaults.gcs_multipart_threshold)),
+            gcs_multipart_chunk_size=int(os.environ.get('GCS_MULTIPART_CHUNK_SIZE', defaults.gcs_multipart_chunk_size)),
+            gcs_composite_threshold=int(os.environ.get('GCS_COMPOSITE_THRESHOLD', defaults.gcs_composite_threshold)),
+            gcs_composite_max_workers=int(os.environ.get('GCS_COMPOSITE_MAX_WORKERS', defaults.gcs_composite_max_workers)),
+            stream_content_threshold=int(os.environ.get('STREAM_CONTENT_THRESHOLD', defaults.stream_content_threshold))
+        )
+
+
+config = Config.from_env()
+
+
+class ORJSONProvider(JSONProvider):
+    """Flask JSON provider backed by orjson"""
+
+    def dumps(self, obj, **kwargs):
+        return orjson.dumps(obj).decode('utf-8')
+
+    def loads(self, s, **kwargs):
+        return orjson.loads(s)
+
+
 app = Flask(__name__)
+app.json = ORJSONProvider(app)
+
+# Compress JSON responses over 1 KB per the client's Accept-Encoding. Streamed
+# responses are left alone: Flask-Compress would buffer the whole stream first.
+app.config['COMPRESS_ALGORITHM'] = ['br', 'gzip']
+app.config['COMPRESS_MIN_SIZE'] = 1024
+app.config['COMPRESS_STREAMS'] = False
+Compress(app)
 
 # Configuration
-BUCKET_NAME = os.environ.get('GCS_BUCKET_NAME', 'weather-data-bucket')
 OPEN_METEO_BASE_URL = 'https://archive-api.open-meteo.com/v1/archive'
+FETCH_RETRIES = 3
+FETCH_RETRY_STATUSES = (502, 503, 504)
+FETCH_BACKOFF_SECONDS = 0.2
+# Open-Meteo's per-call timing field, the only part of a response that varies,
+# with its separating commas so it can be cut out from any key position
+_GENERATION_TIME_RE = re.compile(rb'(,?)\s*"generationtime_ms"\s*:\s*[-+0-9.eE]+\s*(,?)')
+# Precompiled YYYY-MM-DD pattern used by validate_date_format
+_DATE_RE = re.compile(r'(\d{4})-(\d{2})-(\d{2})', re.ASCII)
+# Stored files are never modified, so they can be cached indefinitely downstream
+GCS_CACHE_CONTROL = 'public, max-age=31536000'
+# Internal objects live under prefixes; weather files are stored at the top level
+TEMP_PREFIX = '.tmp/'
+TASK_PREFIX = '.tasks/'
+# Age in days after which internal objects are deleted by bucket lifecycle rules
+# (kept in sync with lifecycle.json, which the deploy scripts apply)
+TEMP_RETENTION_DAYS = 1
+TASK_RETENTION_DAYS = 7
+_TASK_ID_RE = re.compile(r'[0-9a-f]{32}')
+# GCS compose accepts at most 32 source objects per call
+GCS_MAX_COMPOSE_PARTS = 32
+# Maximum (and default) number of files returned per /list-weather-files page
+LIST_PAGE_SIZE = 1000
+STREAM_CHUNK_SIZE = 1024 * 1024
+# Date ranges longer than this are fetched as concurrent chunks of CHUNK_DAYS
+CHUNK_THRESHOLD_DAYS = 365
+CHUNK_DAYS = 90
 
 # Global variable for storage client
 storage_client = None
+_storage_client_lock = threading.Lock()
+
+# Bucket reference cached after its existence has been verified
+_bucket_ref = None
+_bucket_lock = threading.Lock()
+
+# Shared HTTP/2 client so concurrent Open-Meteo calls are multiplexed over one
+# pooled TLS connection; the transport retries failed connection attempts
+_http = httpx.Client(
+    transport=httpx.HTTPTransport(
+        http2=True,
+        limits=httpx.Limits(max_keepalive_connections=32, max_connections=64),
+        retries=3
+    ),
+    timeout=httpx.Timeout(30.0, connect=5.0)
+)
+
+# Archive data for a given query never changes, so identical queries are served
+# from memory; stored filenames are remembered so repeats skip the GCS upload too
+_weather_cache = TTLCache(maxsize=1024, ttl=86400)
+_stored_files = TTLCache(maxsize=1024, ttl=86400)
+_cache_lock = threading.Lock()
+
+# Background store tasks, polled via /task/<task_id>. Status is persisted in the
+# bucket so any worker or instance can answer; _tasks is this process's copy.
+_task_executor = ThreadPoolExecutor(max_workers=32)
+_tasks = TTLCache(maxsize=10000, ttl=3600)
+_task_lock = threading.Lock()
+
+# Worker pool for batch requests; fetches share the HTTP/2 client above
+_executor = ThreadPoolExecutor(max_workers=16)
+# Separate pool for date-range chunks so batch workers never wait on their own pool
+_chunk_executor = ThreadPoolExecutor(max_workers=8)
+_upload_executor = ThreadPoolExecutor(max_workers=config.gcs_composite_max_workers)
 
 
 def get_storage_client():
-    """Get or create the GCS client with lazy initialization"""
+    """Get or create the process-wide GCS client with lazy initialization"""
     global storage_client
-    if storage_client is None:
-        # Check if running in local development mode
-        if os.environ.get('DEVELOPMENT_MODE') == 'true':
-            logger.warning("Running in development mode - GCS operations will be mocked")
-            return None
-        try:
-            storage_client = storage.Client()
-        except Exception as e:
-            logger.error(f"Failed to initialize GCS client: {str(e)}")
-            if os.environ.get('MOCK_GCS') == 'true':
-                logger.info("Using mock GCS client")
-                return None
-            raise
+    if storage_client is not None:
+        return storage_client
+    
+    # Check if running in local development mode
+    if config.development_mode:
+        logger.warning("Running in development mode - GCS operations will be mocked")
+        return None
+    
+    # Serialize first use so concurrent threads share one client and its connection pool
+    with _storage_client_lock:
+        if storage_client is None:
+            try:
+                storage_client = storage.Client()
+            except Exception as e:
+                logger.error(f"Failed to initialize GCS client: {str(e)}")
+                if config.mock_gcs:
+                    logger.info("Using mock GCS client")
+                    return None
+                raise
     return storage_client
 
 
 def get_bucket():
-    """Get or create the GCS bucket"""
+    """Get or create the GCS bucket, verifying it exists only once per process"""
+    global _bucket_ref
+    if _bucket_ref is not None:
+        return _bucket_ref
+    
     client = get_storage_client()
     if client is None:
         logger.info("Mock mode: Skipping bucket operations")
         return None
     
+    with _bucket_lock:
+        if _bucket_ref is not None:
+            return _bucket_ref
+        try:
+            bucket = client.bucket(config.bucket_name)
+            if not bucket.exists():
+                # Expire leftover upload parts and old task status objects
+                bucket.add_lifecycle_delete_rule(age=TEMP_RETENTION_DAYS, matches_prefix=[TEMP_PREFIX])
+                bucket.add_lifecycle_delete_rule(age=TASK_RETENTION_DAYS, matches_prefix=[TASK_PREFIX])
+                bucket = client.create_bucket(bucket)
+                logger.info(f"Created bucket: {config.bucket_name}")
+            _bucket_ref = bucket
+            return bucket
+        except Exception as e:
+            logger.error(f"Error accessing bucket: {str(e)}")
+            raise
+
+
+def strip_volatile_fields(body):
+    """Cut generationtime_ms out of raw JSON bytes so identical data hashes identically"""
+    def drop_field(match):
+        # Keep one comma only when the field sat between two other keys
+        return b',' if match.group(1) and match.group(2) else b''
+    return _GENERATION_TIME_RE.sub(drop_field, body, count=1)
+
+
+def generate_filename(latitude, longitude, start_date, end_date, body):
+    """Generate a content-addressed filename for the weather data"""
+    digest = hashlib.blake2b(strip_volatile_fields(body), digest_size=8).hexdigest()
+    return f"weather_data_lat{latitude}_lon{longitude}_{start_date}_to_{end_date}_{digest}.json"
+
+
+def composite_upload(bucket, filename, data, content_type):
+    """Upload data as parallel temporary parts and compose them into one object"""
+    part_size = max(config.gcs_multipart_chunk_size, math.ceil(len(data) / GCS_MAX_COMPOSE_PARTS))
+    prefix = f"{TEMP_PREFIX}{uuid.uuid4().hex}/{filename}"
+    parts = [
+        bucket.blob(f"{prefix}.part{index}")
+        for index in range(math.ceil(len(data) / part_size))
+    ]
+    
+    futures = []
     try:
-        bucket = client.bucket(BUCKET_NAME)
-        if not bucket.exists():
-            bucket = client.create_bucket(BUCKET_NAME)
-            logger.info(f"Created bucket: {BUCKET_NAME}")
-        return bucket
-    except Exception as e:
-        logger.error(f"Error accessing bucket: {str(e)}")
-        raise
+        for index, part in enumerate(parts):
+            futures.append(_upload_executor.submit(
+                part.upload_from_string,
+                data[index * part_size:(index + 1) * part_size],
+                content_type=content_type,
+                if_generation_match=0,
+                retry=DEFAULT_RETRY
+            ))
+        for future in futures:
+            future.result()
+        
+        blob = bucket.blob(filename)
+        blob.content_type = content_type
+        blob.cache_control = GCS_CACHE_CONTROL
+        blob.compose(parts, if_generation_match=0, retry=DEFAULT_RETRY)
+    finally:
+        # Let in-flight part uploads finish so none is left behind after cleanup
+        wait(futures)
+        bucket.delete_blobs(parts, on_error=lambda part: None)
+
+
+def upload_data(bucket, filename, data, content_type='application/json'):
+    """Upload data to a new GCS object, choosing a strategy based on payload size"""
+    # if_generation_match=0 makes GCS reject an existing name with PreconditionFailed
+    # in the same request instead of overwriting, and makes retries safe
+    if isinstance(data, str):
+        data = data.encode('utf-8')
+    
+    if len(data) > config.gcs_composite_threshold:
+        logger.info(f"Composite upload of {len(data)} bytes: {filename}")
+        composite_upload(bucket, filename, data, content_type)
+    elif len(data) > config.gcs_multipart_threshold:
+        logger.info(f"Resumable upload of {len(data)} bytes: {filename}")
+        blob = bucket.blob(filename, chunk_size=config.gcs_multipart_chunk_size)
+        blob.cache_control = GCS_CACHE_CONTROL
+        blob.upload_from_file(
+            io.BytesIO(data),
+            size=len(data),
+            content_type=content_type,
+            if_generation_match=0,
+            retry=DEFAULT_RETRY
+        )
+    else:
+        blob = bucket.blob(filename)
+        blob.cache_control = GCS_CACHE_CONTROL
+        blob.upload_from_string(
+            data,
+            content_type=content_type,
+            if_generation_match=0,
+            retry=DEFAULT_RETRY
+        )
 
 
-def generate_filename(latitude, longitude, start_date, end_date):
-    """Generate a unique filename for the weather data"""
-    timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-    return f"weather_data_lat{latitude}_lon{longitude}_{start_date}_to_{end_date}_{timestamp}.json"
+def weather_cache_key(latitude, longitude, start_date, end_date):
+    """Build the normalized cache key for a weather query"""
+    return (round(latitude, 4), round(longitude, 4), start_date, end_date)
 
 
 def fetch_weather_data(latitude, longitude, start_date, end_date):
-    """Fetch weather data from Open-Meteo API"""
+    """Fetch weather data from Open-Meteo API as raw JSON bytes"""
+    key = weather_cache_key(latitude, longitude, start_date, end_date)
+    with _cache_lock:
+        cached = _weather_cache.get(key)
+    if cached is not None:
+        logger.info(f"Cache hit for weather data: {key}")
+        return cached
+
     params = {
         'latitude': latitude,
         'longitude': longitude,
@@ -81,18 +312,74 @@ def fetch_weather_data(latitude, longitude, start_date, end_date):
     }
     
     try:
-        response = requests.get(OPEN_METEO_BASE_URL, params=params, timeout=30)
+        # Retry transient upstream errors with exponential backoff
+        for attempt in range(FETCH_RETRIES + 1):
+            response = _http.get(OPEN_METEO_BASE_URL, params=params)
+            if response.status_code not in FETCH_RETRY_STATUSES or attempt == FETCH_RETRIES:
+                break
+            time.sleep(FETCH_BACKOFF_SECONDS * 2 ** attempt)
         response.raise_for_status()
-        return response.json()
-    except requests.exceptions.RequestException as e:
+        # Keep the raw body so it can be stored without a serialize round trip
+        weather_data = response.content
+    except httpx.HTTPError as e:
         logger.error(f"Error fetching weather data: {str(e)}")
         raise
 
+    with _cache_lock:
+        _weather_cache[key] = weather_data
+    return weather_data
+
+
+def split_date_range(start_date, end_date):
+    """Split a YYYY-MM-DD date range into consecutive chunks of at most CHUNK_DAYS days"""
+    start = date.fromisoformat(start_date)
+    end = date.fromisoformat(end_date)
+    chunks = []
+    while start <= end:
+        chunk_end = min(start + timedelta(days=CHUNK_DAYS - 1), end)
+        chunks.append((start.isoformat(), chunk_end.isoformat()))
+        start = chunk_end + timedelta(days=1)
+    return chunks
+
+
+def merge_weather_data(chunks):
+    """Merge chunked Open-Meteo responses by concatenating their daily arrays"""
+    merged = dict(chunks[0])
+    merged['daily'] = {
+        variable: [value for chunk in chunks for value in chunk['daily'][variable]]
+        for variable in chunks[0]['daily']
+    }
+    return merged
+
+
+def fetch_weather_range(latitude, longitude, start_date, end_date):
+    """Fetch weather data as JSON bytes, splitting long date ranges into concurrent requests"""
+    days = (date.fromisoformat(end_date) - date.fromisoformat(start_date)).days
+    if days <= CHUNK_THRESHOLD_DAYS:
+        return fetch_weather_data(latitude, longitude, start_date, end_date)
+    
+    chunks = split_date_range(start_date, end_date)
+    logger.info(f"Fetching {start_date} to {end_date} in {len(chunks)} chunks")
+    futures = [
+        _chunk_executor.submit(fetch_weather_data, latitude, longitude, chunk_start, chunk_end)
+        for chunk_start, chunk_end in chunks
+    ]
+    return orjson.dumps(merge_weather_data([orjson.loads(future.result()) for future in futures]))
+
 
 def validate_date_format(date_string):
     """Validate date format YYYY-MM-DD"""
+    if not isinstance(date_string, str):
+        return False
+    match = _DATE_RE.fullmatch(date_string)
+    if match is None:
+        return False
+    year, month, day = (int(group) for group in match.groups())
+    if not (1 <= month <= 12 and 1 <= day <= 31):
+        return False
+    # Only dates passing the cheap checks pay for a full calendar check
     try:
-        datetime.strptime(date_string, '%Y-%m-%d')
+        date(year, month, day)
         return True
     except ValueError:
         return False
@@ -107,63 +394,198 @@ def validate_coordinates(latitude, longitude):
     return True
 
 
+def parse_json_body():
+    """Parse the request body with orjson straight from the raw bytes"""
+    return orjson.loads(request.get_data(cache=False))
+
+
+def validate_weather_request(data):
+    """Validate a weather query payload, returning an error message or None"""
+    if not isinstance(data, dict):
+        return 'Request body must be a JSON object'
+    
+    required_fields = ['latitude', 'longitude', 'start_date', 'end_date']
+    
+    # Check for required fields
+    for field in required_fields:
+        if field not in data:
+            return f'Missing required field: {field}'
+    
+    # Validate coordinates
+    if not validate_coordinates(data['latitude'], data['longitude']):
+        return 'Invalid latitude or longitude values'
+    
+    # Validate date formats
+    if not validate_date_format(data['start_date']) or not validate_date_format(data['end_date']):
+        return 'Invalid date format. Use YYYY-MM-DD'
+    
+    # Validate date range
+    if data['start_date'] > data['end_date']:
+        return 'start_date must be before or equal to end_date'
+    
+    return None
+
+
+def stored_filename(latitude, longitude, start_date, end_date):
+    """Return the filename already stored for an identical query, if any"""
+    key = weather_cache_key(latitude, longitude, start_date, end_date)
+    with _cache_lock:
+        return _stored_files.get(key)
+
+
+def save_weather_data(latitude, longitude, start_date, end_date):
+    """Fetch weather data and store it in GCS, returning the filename"""
+    # Reuse the file already stored for an identical query
+    key = weather_cache_key(latitude, longitude, start_date, end_date)
+    filename = stored_filename(latitude, longitude, start_date, end_date)
+    
+    if filename is not None:
+        logger.info(f"Weather data already stored: {filename}")
+        return filename
+    
+    # Fetch weather data as JSON bytes, ready for upload
+    body = fetch_weather_range(latitude, longitude, start_date, end_date)
+    
+    # Generate filename from the content so duplicate payloads share one object
+    filename = generate_filename(latitude, longitude, start_date, end_date, body)
+    
+    # Store in GCS
+    bucket = get_bucket()
+    if bucket is None:
+        # Mock mode - just log the data
+        logger.info(f"Mock mode: Would store weather data with filename: {filename}")
+        logger.info(f"Mock mode: Weather data size: {len(body)} bytes")
+    else:
+        try:
+            upload_data(bucket, filename, body)
+        except PreconditionFailed:
+            # Same name means same content, which is already stored
+            logger.info(f"Identical weather data already stored: {filename}")
+        with _cache_lock:
+            _stored_files[key] = filename
+    
+    logger.info(f"Successfully stored weather data: {filename}")
+    return filename
+
+
+def store_error_message(error):
+    """Log a failed store operation and return the client-facing error message"""
+    if isinstance(error, httpx.HTTPError):
+        logger.error(f"Weather API error: {str(error)}")
+        return 'Failed to fetch weather data from Open-Meteo API'
+    logger.error(f"Unexpected error: {str(error)}")
+    return 'Internal server error'
+
+
+def save_task(task):
+    """Record a task's status locally and in the bucket"""
+    with _task_lock:
+        _tasks[task['task_id']] = task
+    
+    bucket = get_bucket()
+    if bucket is not None:
+        blob = bucket.blob(f"{TASK_PREFIX}{task['task_id']}.json")
+        blob.cache_control = 'no-store'
+        blob.upload_from_string(
+            orjson.dumps(task),
+            content_type='application/json',
+            retry=DEFAULT_RETRY
+        )
+
+
+def load_task(task_id):
+    """Look up a task's status, falling back to the bucket for other workers' tasks"""
+    with _task_lock:
+        task = _tasks.get(task_id)
+    if task is not None:
+        return task
+    
+    bucket = get_bucket()
+    if bucket is None:
+        return None
+    blob = bucket.get_blob(f"{TASK_PREFIX}{task_id}.json")
+    if blob is None:
+        return None
+    return orjson.loads(blob.download_as_bytes())
+
+
+def run_task(task):
+    """Persist a task's pending status, then fetch and store its weather data"""
+    try:
+        save_task(task)
+    except Exception as e:
+        logger.error(f"Failed to record status for task {task['task_id']}: {str(e)}")
+    
+    return save_weather_data(
+        task['location']['latitude'],
+        task['location']['longitude'],
+        task['date_range']['start_date'],
+        task['date_range']['end_date']
+    )
+
+
+def finish_task(task, future):
+    """Record the outcome of a background store task"""
+    error = future.exception()
+    task = dict(task)
+    if error is None:
+        task['status'] = 'completed'
+        task['filename'] = future.result()
+    else:
+        task['status'] = 'failed'
+        task['error'] = store_error_message(error)
+    
+    try:
+        save_task(task)
+    except Exception as e:
+        logger.error(f"Failed to record status for task {task['task_id']}: {str(e)}")
+
+
 @app.route('/store-weather-data', methods=['POST'])
 def store_weather_data():
-    """Store weather data from Open-Meteo API to GCS"""
+    """Accept a request to store weather data from Open-Meteo API to GCS"""
     try:
         # Validate request body
         if not request.is_json:
             return jsonify({'error': 'Request must be JSON'}), 400
         
-        data = request.get_json()
-        required_fields = ['latitude', 'longitude', 'start_date', 'end_date']
-        
-        # Check for required fields
-        for field in required_fields:
-            if field not in data:
-                return jsonify({'error': f'Missing required field: {field}'}), 400
+        try:
+            data = parse_json_body()
+        except orjson.JSONDecodeError:
+            return jsonify({'error': 'Request body must be valid JSON'}), 400
+        error = validate_weather_request(data)
+        if error:
+            return jsonify({'error': error}), 400
         
         latitude = data['latitude']
         longitude = data['longitude']
         start_date = data['start_date']
         end_date = data['end_date']
         
-        # Validate coordinates
-        if not validate_coordinates(latitude, longitude):
-            return jsonify({'error': 'Invalid latitude or longitude values'}), 400
-        
-        # Validate date formats
-        if not validate_date_format(start_date) or not validate_date_format(end_date):
-            return jsonify({'error': 'Invalid date format. Use YYYY-MM-DD'}), 400
-        
-        # Validate date range
-        if start_date > end_date:
-            return jsonify({'error': 'start_date must be before or equal to end_date'}), 400
-        
-        # Fetch weather data
-        weather_data = fetch_weather_data(latitude, longitude, start_date, end_date)
-        
-        # Generate filename
-        filename = generate_filename(latitude, longitude, start_date, end_date)
-        
-        # Store in GCS
-        bucket = get_bucket()
-        if bucket is None:
-            # Mock mode - just log the data
-            logger.info(f"Mock mode: Would store weather data with filename: {filename}")
-            logger.info(f"Mock mode: Weather data size: {len(json.dumps(weather_data))} bytes")
-        else:
-            blob = bucket.blob(filename)
-            blob.upload_from_string(
-                json.dumps(weather_data, indent=2),
-                content_type='application/json'
-            )
-        
-        logger.info(f"Successfully stored weather data: {filename}")
+        # Identical queries already stored are answered without a task
+        filename = stored_filename(latitude, longitude, start_date, end_date)
+        if filename is not None:
+            return jsonify({
+                'message': 'Weather data stored successfully',
+                'status': 'completed',
+                'filename': filename,
+                'location': {
+                    'latitude': latitude,
+                    'longitude': longitude
+                },
+                'date_range': {
+                    'start_date': start_date,
+                    'end_date': end_date
+                }
+            }), 201
         
-        return jsonify({
-            'message': 'Weather data stored successfully',
-            'filename': filename,
+        # Fetch and upload in the background; the client polls status_url. The
+        # worker persists the pending status, keeping GCS off the request thread.
+        task_id = uuid.uuid4().hex
+        task = {
+            'task_id': task_id,
+            'status': 'pending',
+            'filename': None,
             'location': {
                 'latitude': latitude,
                 'longitude': longitude
@@ -172,11 +594,94 @@ def store_weather_data():
                 'start_date': start_date,
                 'end_date': end_date
             }
-        }), 201
+        }
+        with _task_lock:
+            _tasks[task_id] = task
+        
+        future = _task_executor.submit(run_task, task)
+        future.add_done_callback(lambda done: finish_task(task, done))
+        
+        return jsonify({
+            'message': 'Weather data request accepted',
+            'status': 'pending',
+            'task_id': task_id,
+            'status_url': f'/task/{task_id}',
+            'location': task['location'],
+            'date_range': task['date_range']
+        }), 202
+        
+    except Exception as e:
+        logger.error(f"Unexpected error: {str(e)}")
+        return jsonify({'error': 'Internal server error'}), 500
+
+
+@app.route('/task/<task_id>', methods=['GET'])
+def get_task_status(task_id):
+    """Get the status of a background store-weather-data task"""
+    try:
+        task = load_task(task_id) if _TASK_ID_RE.fullmatch(task_id) else None
+        
+        if task is None:
+            return jsonify({'error': 'Task not found'}), 404
+        
+        return jsonify(task), 200
+        
+    except Exception as e:
+        logger.error(f"Error retrieving task status: {str(e)}")
+        return jsonify({'error': 'Failed to retrieve task status'}), 500
+
+
+@app.route('/store-weather-data/batch', methods=['POST'])
+def store_weather_data_batch():
+    """Store weather data for many locations/date ranges in one request"""
+    try:
+        # Validate request body
+        if not request.is_json:
+            return jsonify({'error': 'Request must be JSON'}), 400
+        
+        try:
+            data = parse_json_body()
+        except orjson.JSONDecodeError:
+            return jsonify({'error': 'Request body must be valid JSON'}), 400
+        items = data.get('items') if isinstance(data, dict) else None
+        if not isinstance(items, list) or not items:
+            return jsonify({'error': 'items must be a non-empty list'}), 400
+        if len(items) > config.max_batch_size:
+            return jsonify({'error': f'items must contain at most {config.max_batch_size} entries'}), 400
+        
+        # Validate every item before doing any work
+        for index, item in enumerate(items):
+            error = validate_weather_request(item)
+            if error:
+                return jsonify({'error': f'items[{index}]: {error}'}), 400
+        
+        futures = [
+            _executor.submit(
+                save_weather_data,
+                item['latitude'],
+                item['longitude'],
+                item['start_date'],
+                item['end_date']
+            )
+            for item in items
+        ]
+        
+        results = []
+        for future in futures:
+            try:
+                results.append({'filename': future.result(), 'status': 'stored'})
+            except Exception as e:
+                results.append({
+                    'filename': None,
+                    'status': 'failed',
+                    'error': store_error_message(e)
+                })
+        
+        return jsonify({
+            'results': results,
+            'count': len(results)
+        }), 200
         
-    except requests.exceptions.RequestException as e:
-        logger.error(f"Weather API error: {str(e)}")
-        return jsonify({'error': 'Failed to fetch weather data from Open-Meteo API'}), 502
     except Exception as e:
         logger.error(f"Unexpected error: {str(e)}")
         return jsonify({'error': 'Internal server error'}), 500
@@ -184,7 +689,7 @@ def store_weather_data():
 
 @app.route('/list-weather-files', methods=['GET'])
 def list_weather_files():
-    """List all weather data files in GCS bucket"""
+    """List weather data files in GCS bucket, one page at a time"""
     try:
         bucket = get_bucket()
         if bucket is None:
@@ -193,23 +698,43 @@ def list_weather_files():
             return jsonify({
                 'files': [],
                 'count': 0,
+                'next_page_token': None,
                 'message': 'Running in mock mode - no files available'
             }), 200
         
-        blobs = bucket.list_blobs()
+        # Validate pagination parameters
+        try:
+            limit = int(request.args.get('limit', LIST_PAGE_SIZE))
+        except ValueError:
+            return jsonify({'error': 'limit must be an integer'}), 400
+        if not (1 <= limit <= LIST_PAGE_SIZE):
+            return jsonify({'error': f'limit must be between 1 and {LIST_PAGE_SIZE}'}), 400
+        page_token = request.args.get('page_token') or None
+        
+        # Fetch a single page of top-level objects, asking GCS only for the fields we
+        # return; the delimiter keeps internal prefixed objects out of the listing
+        blobs = bucket.list_blobs(
+            max_results=limit,
+            page_token=page_token,
+            delimiter='/',
+            fields='items(name,size,timeCreated,updated),nextPageToken'
+        )
+        page = next(blobs.pages)
         
-        files = []
-        for blob in blobs:
-            files.append({
+        files = [
+            {
                 'filename': blob.name,
                 'size': blob.size,
                 'created': blob.time_created.isoformat() if blob.time_created else None,
                 'updated': blob.updated.isoformat() if blob.updated else None
-            })
+            }
+            for blob in page
+        ]
         
         return jsonify({
             'files': files,
-            'count': len(files)
+            'count': len(files),
+            'next_page_token': blobs.next_page_token
         }), 200
         
     except Exception as e:
@@ -217,6 +742,18 @@ def list_weather_files():
         return jsonify({'error': 'Failed to list files'}), 500
 
 
+def stream_weather_file(blob, filename):
+    """Yield a {filename, data} JSON document with the blob content streamed as data"""
+    yield b'{"filename":' + orjson.dumps(filename) + b',"data":'
+    with blob.open('rb', chunk_size=STREAM_CHUNK_SIZE) as reader:
+        while True:
+            chunk = reader.read(STREAM_CHUNK_SIZE)
+            if not chunk:
+                break
+            yield chunk
+    yield b'}'
+
+
 @app.route('/weather-file-content/<filename>', methods=['GET'])
 def get_weather_file_content(filename):
     """Get content of a specific weather data file from GCS"""
@@ -239,21 +776,30 @@ def get_weather_file_content(filename):
                 }
             }), 200
         
-        blob = bucket.blob(filename)
+        # get_blob fetches metadata (including size) and doubles as the existence check
+        blob = bucket.get_blob(filename)
         
-        if not blob.exists():
+        if blob is None:
             return jsonify({'error': 'File not found'}), 404
         
-        # Download and parse JSON content
-        content = blob.download_as_text()
-        weather_data = json.loads(content)
+        if blob.size is not None and blob.size > config.stream_content_threshold:
+            # Large files are piped straight through without parsing server-side
+            logger.info(f"Streaming {blob.size} bytes for file: {filename}")
+            return app.response_class(
+                stream_with_context(stream_weather_file(blob, filename)),
+                status=200,
+                mimetype='application/json'
+            )
+        
+        # Download and parse JSON content without an intermediate text decode
+        weather_data = orjson.loads(blob.download_as_bytes())
         
         return jsonify({
             'filename': filename,
             'data': weather_data
         }), 200
         
-    except json.JSONDecodeError:
+    except orjson.JSONDecodeError:
         logger.error(f"Invalid JSON in file: {filename}")
         return jsonify({'error': 'Invalid JSON file'}), 500
     except Exception as e:
@@ -287,6 +833,7 @@ def internal_error(error):
 
 
 if __name__ == '__main__':
-    # For local development
+    # For local development only; production runs under gunicorn (see gunicorn.conf.py)
     port = int(os.environ.get('PORT', 8000))
-    app.run(host='0.0.0.0', port=port, debug=True)
\ No newline at end of file
+    debug = os.environ.get('FLASK_ENV') == 'development'
+    app.run(host='0.0.0.0', port=port, debug=debug, threaded=True)
\ No newline at end of file
@@ -40,6 +40,8 @@ try {
 } catch {
     Write-Host "Bucket might already exist, continuing..."
 }
+# Expire leftover upload parts and old task status objects
+gsutil lifecycle set lifecycle.json gs://$BUCKET_NAME
 
 # Step 4: Build and deploy to Cloud Run
 Write-Host "Step 4: Building and deploying to Cloud Run..." -ForegroundColor Yellow
@@ -53,6 +55,7 @@ gcloud run deploy $SERVICE_NAME `
     --cpu 1 `
     --min-instances 0 `
     --max-instances 10 `
+    --no-cpu-throttling `
     --timeout 300
 
 # Step 5: Get service URL
@@ -33,6 +33,8 @@ gcloud services enable storage.googleapis.com
 # Step 3: Create GCS bucket
 echo -e "${YELLOW}Step 3: Creating Google Cloud Storage bucket...${NC}"
 gsutil mb gs://$BUCKET_NAME || echo "Bucket might already exist, continuing..."
+# Expire leftover upload parts and old task status objects
+gsutil lifecycle set lifecycle.json gs://$BUCKET_NAME
 
 # Step 4: Build and deploy to Cloud Run
 echo -e "${YELLOW}Step 4: Building and deploying to Cloud Run...${NC}"
@@ -46,6 +48,7 @@ gcloud run deploy $SERVICE_NAME \
     --cpu 1 \
     --min-instances 0 \
     --max-instances 10 \
+    --no-cpu-throttling \
     --timeout 300
 
 # Step 5: Get service URL
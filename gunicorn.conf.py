@@ -0,0 +1,23 @@
+# Gunicorn configuration for the weather data backend
+import multiprocessing
+import os
+
+bind = f":{os.environ.get('PORT', '8000')}"
+
+# Threaded workers share each process's HTTP client, GCS client and executors
+worker_class = 'gthread'
+workers = int(os.environ.get('WEB_CONCURRENCY', multiprocessing.cpu_count() * 2))
+threads = int(os.environ.get('GUNICORN_THREADS', 8))
+worker_connections = 1000
+
+# Cloud Run enforces its own request timeout
+timeout = 0
+
+
+def post_fork(server, worker):
+    """Create each worker's GCS client up front so requests share one warm client"""
+    from app import get_storage_client
+    try:
+        get_storage_client()
+    except Exception as e:
+        worker.log.warning(f"GCS client will be created on first request: {str(e)}")
@@ -0,0 +1,477 @@
+import dataclasses
+import io
+import os
+import threading
+import time
+from types import SimpleNamespace
+from concurrent.futures import Future
+from datetime import date, datetime, timedelta, timezone
+
+# Mock GCS so the app can be imported and exercised without credentials
+os.environ['DEVELOPMENT_MODE'] = 'true'
+
+import httpx
+import orjson
+import pytest
+from google.api_core.exceptions import PreconditionFailed
+from google.cloud import storage
+
+import app as weather_app
+
+
+@pytest.fixture
+def client():
+    weather_app.app.config['TESTING'] = True
+    with weather_app.app.test_client() as client:
+        yield client
+
+
+@pytest.fixture(autouse=True)
+def clear_caches():
+    """Keep cached fetches and stored filenames from leaking between tests"""
+    weather_app._weather_cache.clear()
+    weather_app._stored_files.clear()
+    yield
+
+
+def weather_item(**overrides):
+    item = {
+        'latitude': 52.52,
+        'longitude': 13.405,
+        'start_date': '2023-01-01',
+        'end_date': '2023-01-31'
+    }
+    item.update(overrides)
+    return item
+
+
+def test_batch_rejects_invalid_item_by_index(client):
+    response = client.post('/store-weather-data/batch', json={
+        'items': [weather_item(), weather_item(latitude=200)]
+    })
+    assert response.status_code == 400
+    assert response.get_json() == {'error': 'items[1]: Invalid latitude or longitude values'}
+
+
+def test_batch_rejects_missing_field_by_index(client):
+    item = weather_item()
+    del item['end_date']
+    response = client.post('/store-weather-data/batch', json={'items': [item]})
+    assert response.status_code == 400
+    assert response.get_json() == {'error': 'items[0]: Missing required field: end_date'}
+
+
+def test_batch_rejects_empty_items(client):
+    response = client.post('/store-weather-data/batch', json={'items': []})
+    assert response.status_code == 400
+    assert response.get_json() == {'error': 'items must be a non-empty list'}
+
+
+def test_batch_rejects_oversized_batch(client):
+    items = [weather_item()] * (weather_app.config.max_batch_size + 1)
+    response = client.post('/store-weather-data/batch', json={'items': items})
+    assert response.status_code == 400
+
+
+class FakeBlob:
+    """In-memory stand-in for a GCS blob"""
+
+    def __init__(self, bucket, name, chunk_size=None):
+        self.bucket = bucket
+        self.name = name
+        self.chunk_size = chunk_size
+        self.content_type = None
+        self.cache_control = None
+
+    @property
+    def size(self):
+        return len(self.bucket.objects[self.name])
+
+    def _store(self, method, data, if_generation_match):
+        self.bucket.calls.append((method, self.name))
+        self.bucket.threads.append(threading.current_thread())
+        if any(self.name.endswith(suffix) for suffix in self.bucket.fail_suffixes):
+            raise RuntimeError(f'upload failed: {self.name}')
+        time.sleep(self.bucket.delay)
+        if if_generation_match == 0 and self.name in self.bucket.objects:
+            raise PreconditionFailed(f'{self.name} already exists')
+        self.bucket.objects[self.name] = data.encode('utf-8') if isinstance(data, str) else bytes(data)
+
+    def upload_from_string(self, data, content_type=None, if_generation_match=None, retry=None):
+        self._store('string', data, if_generation_match)
+
+    def upload_from_file(self, file_obj, size=None, content_type=None, if_generation_match=None, retry=None):
+        self._store('file', file_obj.read(), if_generation_match)
+
+    def compose(self, sources, if_generation_match=None, retry=None):
+        self._store('compose', b''.join(self.bucket.objects[part.name] for part in sources), if_generation_match)
+
+    def download_as_bytes(self):
+        self.bucket.calls.append(('download', self.name))
+        return self.bucket.objects[self.name]
+
+    def open(self, mode, chunk_size=None):
+        self.bucket.calls.append(('open', self.name))
+        return io.BytesIO(self.bucket.objects[self.name])
+
+
+class FakeBucket:
+    """In-memory stand-in for a GCS bucket that records upload calls"""
+
+    def __init__(self):
+        self.objects = {}
+        self.calls = []
+        self.threads = []
+        self.fail_suffixes = set()
+        self.delay = 0
+
+    def blob(self, name, chunk_size=None):
+        return FakeBlob(self, name, chunk_size)
+
+    def get_blob(self, name):
+        return FakeBlob(self, name) if name in self.objects else None
+
+    def delete_blobs(self, blobs, on_error=None):
+        for blob in blobs:
+            self.objects.pop(blob.name, None)
+
+
+@pytest.fixture
+def bucket(monkeypatch):
+    fake = FakeBucket()
+    monkeypatch.setattr(weather_app, 'get_bucket', lambda: fake)
+    return fake
+
+
+def stub_open_meteo(monkeypatch, status_code=200, body=b'{"latitude":52.52,"daily":{"time":["2023-01-01"]}}'):
+    """Replace the shared HTTP client's get with a canned Open-Meteo response"""
+    def fake_get(url, params=None):
+        return httpx.Response(status_code, content=body, request=httpx.Request('GET', url))
+    monkeypatch.setattr(weather_app._http, 'get', fake_get)
+
+
+def wait_for_task(client, status_url, timeout=5):
+    deadline = time.monotonic() + timeout
+    while True:
+        task = client.get(status_url).get_json()
+        if task['status'] != 'pending' or time.monotonic() > deadline:
+            return task
+        time.sleep(0.01)
+
+
+def test_store_weather_data_task_completes(client, monkeypatch):
+    stub_open_meteo(monkeypatch)
+    response = client.post('/store-weather-data', json=weather_item())
+    assert response.status_code == 202
+    accepted = response.get_json()
+    assert accepted['status_url'] == f"/task/{accepted['task_id']}"
+    
+    task = wait_for_task(client, accepted['status_url'])
+    assert task['status'] == 'completed'
+    assert task['filename'].startswith('weather_data_lat52.52_lon13.405_2023-01-01_to_2023-01-31_')
+    assert task['date_range'] == {'start_date': '2023-01-01', 'end_date': '2023-01-31'}
+
+
+def test_store_weather_data_keeps_gcs_off_request_thread(client, monkeypatch, bucket):
+    stub_open_meteo(monkeypatch)
+    response = client.post('/store-weather-data', json=weather_item())
+    assert response.status_code == 202
+    assert response.get_json()['status'] == 'pending'
+    task_id = response.get_json()['task_id']
+    
+    task = wait_for_task(client, f'/task/{task_id}')
+    assert task['status'] == 'completed'
+    assert threading.current_thread() not in bucket.threads
+    assert orjson.loads(bucket.objects[f'.tasks/{task_id}.json'])['status'] == 'completed'
+
+
+def test_store_weather_data_answers_stored_query_without_task(client, monkeypatch, bucket):
+    stub_open_meteo(monkeypatch)
+    first = client.post('/store-weather-data', json=weather_item())
+    filename = wait_for_task(client, first.get_json()['status_url'])['filename']
+    uploads = len(bucket.calls)
+    
+    response = client.post('/store-weather-data', json=weather_item())
+    assert response.status_code == 201
+    assert response.get_json()['status'] == 'completed'
+    assert response.get_json()['filename'] == filename
+    assert 'task_id' not in response.get_json()
+    assert len(bucket.calls) == uploads
+
+
+def test_created_bucket_expires_internal_objects(monkeypatch):
+    class MissingBucket(storage.Bucket):
+        def exists(self, *args, **kwargs):
+            return False
+    
+    class FakeClient:
+        def bucket(self, name):
+            return MissingBucket(None, name)
+        
+        def create_bucket(self, bucket):
+            self.created = bucket
+            return bucket
+    
+    client = FakeClient()
+    monkeypatch.setattr(weather_app, '_bucket_ref', None)
+    monkeypatch.setattr(weather_app, 'get_storage_client', lambda: client)
+    
+    weather_app.get_bucket()
+    rules = {rule['condition']['matchesPrefix'][0]: rule['condition']['age'] for rule in client.created.lifecycle_rules}
+    assert rules == {'.tmp/': weather_app.TEMP_RETENTION_DAYS, '.tasks/': weather_app.TASK_RETENTION_DAYS}
+
+
+def test_store_weather_data_task_fails_on_upstream_error(client, monkeypatch):
+    stub_open_meteo(monkeypatch, status_code=400, body=b'{"error":true}')
+    response = client.post('/store-weather-data', json=weather_item())
+    assert response.status_code == 202
+    
+    task = wait_for_task(client, response.get_json()['status_url'])
+    assert task['status'] == 'failed'
+    assert task['filename'] is None
+    assert task['error'] == 'Failed to fetch weather data from Open-Meteo API'
+
+
+def test_store_weather_data_rejects_invalid_request(client):
+    response = client.post('/store-weather-data', json=weather_item(start_date='2023-02-30'))
+    assert response.status_code == 400
+    assert response.get_json() == {'error': 'Invalid date format. Use YYYY-MM-DD'}
+
+
+def test_task_status_unknown_task(client):
+    assert client.get('/task/' + '0' * 32).status_code == 404
+    assert client.get('/task/not-a-task-id').status_code == 404
+
+
+def test_finish_task_records_evicted_task(client):
+    task = {'task_id': 'b' * 32, 'status': 'pending', 'filename': None}
+    weather_app._tasks.pop(task['task_id'], None)
+    done = Future()
+    done.set_result('weather.json')
+    
+    weather_app.finish_task(task, done)
+    
+    response = client.get(f"/task/{task['task_id']}")
+    assert response.get_json()['status'] == 'completed'
+    assert response.get_json()['filename'] == 'weather.json'
+
+
+def test_task_status_falls_back_to_bucket(client, monkeypatch):
+    task_id = 'a' * 32
+    stored = {'task_id': task_id, 'status': 'completed', 'filename': 'weather.json'}
+    
+    class FakeBlob:
+        def download_as_bytes(self):
+            return orjson.dumps(stored)
+    
+    class FakeBucket:
+        def get_blob(self, name):
+            return FakeBlob() if name == f'.tasks/{task_id}.json' else None
+    
+    monkeypatch.setattr(weather_app, 'get_bucket', lambda: FakeBucket())
+    response = client.get(f'/task/{task_id}')
+    assert response.status_code == 200
+    assert response.get_json() == stored
+
+
+def test_split_date_range_is_contiguous_and_bounded():
+    chunks = weather_app.split_date_range('2020-01-01', '2021-12-31')
+    assert chunks[0][0] == '2020-01-01'
+    assert chunks[-1][1] == '2021-12-31'
+    for (_, end), (next_start, _) in zip(chunks, chunks[1:]):
+        assert date.fromisoformat(next_start) - date.fromisoformat(end) == timedelta(days=1)
+    for start, end in chunks:
+        days = (date.fromisoformat(end) - date.fromisoformat(start)).days + 1
+        assert 1 <= days <= weather_app.CHUNK_DAYS
+
+
+def test_split_date_range_single_day():
+    assert weather_app.split_date_range('2023-05-01', '2023-05-01') == [('2023-05-01', '2023-05-01')]
+
+
+def test_merge_weather_data_concatenates_daily_arrays():
+    chunks = [
+        {'latitude': 52.52, 'daily': {'time': ['2023-01-01'], 'temperature_2m_max': [5.0]}},
+        {'latitude': 52.52, 'daily': {'time': ['2023-01-02', '2023-01-03'], 'temperature_2m_max': [6.0, 7.0]}}
+    ]
+    merged = weather_app.merge_weather_data(chunks)
+    assert merged['latitude'] == 52.52
+    assert merged['daily'] == {
+        'time': ['2023-01-01', '2023-01-02', '2023-01-03'],
+        'temperature_2m_max': [5.0, 6.0, 7.0]
+    }
+
+
+@pytest.mark.parametrize('value, expected', [
+    ('2023-01-01', True),
+    ('2024-02-29', True),
+    ('2023-02-30', False),
+    ('2023-13-01', False),
+    ('2023-1-1', False),
+    ('2023-01-01\n', False),
+    (None, False),
+    (20230101, False)
+])
+def test_validate_date_format(value, expected):
+    assert weather_app.validate_date_format(value) is expected
+
+
+@pytest.mark.parametrize('body', [
+    b'{"generationtime_ms":0.04,"latitude":52.52,"daily":{"time":["2023-01-01"]}}',
+    b'{"latitude":52.52,"generationtime_ms":0.04,"daily":{"time":["2023-01-01"]}}',
+    b'{"latitude":52.52,"daily":{"time":["2023-01-01"]},"generationtime_ms":0.04}',
+    b'{"latitude": 52.52, "daily": {"time": ["2023-01-01"]}, "generationtime_ms": 4e-2}'
+])
+def test_strip_volatile_fields_leaves_valid_json(body):
+    stripped = orjson.loads(weather_app.strip_volatile_fields(body))
+    assert stripped == {'latitude': 52.52, 'daily': {'time': ['2023-01-01']}}
+
+
+def test_strip_volatile_fields_only_key():
+    assert weather_app.strip_volatile_fields(b'{"generationtime_ms":1.5}') == b'{}'
+
+
+def test_generate_filename_ignores_generation_time_as_last_key():
+    first = b'{"latitude":52.52,"daily":{"time":["2023-01-01"]},"generationtime_ms":0.04}'
+    second = b'{"latitude":52.52,"daily":{"time":["2023-01-01"]},"generationtime_ms":12.7}'
+    other = b'{"latitude":52.52,"daily":{"time":["2023-01-02"]},"generationtime_ms":0.04}'
+    name = weather_app.generate_filename(52.52, 13.405, '2023-01-01', '2023-01-01', first)
+    assert weather_app.generate_filename(52.52, 13.405, '2023-01-01', '2023-01-01', second) == name
+    assert weather_app.generate_filename(52.52, 13.405, '2023-01-01', '2023-01-01', other) != name
+
+
+@pytest.fixture
+def small_uploads(monkeypatch):
+    """Shrink upload thresholds so every strategy can be exercised with a few bytes"""
+    monkeypatch.setattr(weather_app, 'config', dataclasses.replace(
+        weather_app.config,
+        gcs_multipart_threshold=16,
+        gcs_multipart_chunk_size=4,
+        gcs_composite_threshold=64
+    ))
+
+
+@pytest.mark.parametrize('size, method', [(16, 'string'), (17, 'file'), (64, 'file'), (65, 'compose')])
+def test_upload_data_strategy_matches_size(small_uploads, size, method):
+    bucket = FakeBucket()
+    data = bytes(range(size))
+    weather_app.upload_data(bucket, 'weather.json', data)
+    assert bucket.calls[-1] == (method, 'weather.json')
+    assert bucket.objects == {'weather.json': data}
+
+
+def test_composite_upload_stays_within_compose_limit(small_uploads):
+    bucket = FakeBucket()
+    data = bytes(index % 251 for index in range(1000))
+    weather_app.upload_data(bucket, 'weather.json', data)
+    
+    parts = [name for method, name in bucket.calls if name.startswith(weather_app.TEMP_PREFIX)]
+    assert 1 < len(parts) <= weather_app.GCS_MAX_COMPOSE_PARTS
+    assert bucket.objects == {'weather.json': data}
+
+
+def test_composite_upload_cleans_up_parts_when_a_part_fails(small_uploads):
+    bucket = FakeBucket()
+    bucket.fail_suffixes = {'.part0'}
+    # Slow the remaining parts so they are still in flight when part0 fails
+    bucket.delay = 0.05
+    
+    with pytest.raises(RuntimeError):
+        weather_app.upload_data(bucket, 'weather.json', bytes(200))
+    
+    # Any part upload still running after cleanup would land here as an orphan
+    time.sleep(bucket.delay * 4)
+    assert bucket.objects == {}
+
+
+def test_save_weather_data_deduplicates_identical_payloads(monkeypatch, bucket):
+    first = b'{"latitude":52.52,"generationtime_ms":0.04,"daily":{"time":["2023-01-01"]}}'
+    second = b'{"latitude":52.52,"generationtime_ms":3.91,"daily":{"time":["2023-01-01"]}}'
+    
+    stub_open_meteo(monkeypatch, body=first)
+    filename = weather_app.save_weather_data(52.52, 13.405, '2023-01-01', '2023-01-01')
+    
+    # Forget this process's caches so the second call fetches and uploads again
+    weather_app._weather_cache.clear()
+    weather_app._stored_files.clear()
+    stub_open_meteo(monkeypatch, body=second)
+    assert weather_app.save_weather_data(52.52, 13.405, '2023-01-01', '2023-01-01') == filename
+    
+    # The second upload hit the if_generation_match=0 precondition and was treated as stored
+    assert bucket.calls == [('string', filename), ('string', filename)]
+    assert bucket.objects == {filename: first}
+
+
+WEATHER_FILE = b'{"latitude":52.52,"daily":{"time":["2023-01-01","2023-01-02"],"temperature_2m_max":[5.0,7.1]}}'
+
+
+def test_weather_file_content_streams_large_files(client, monkeypatch, bucket):
+    monkeypatch.setattr(weather_app, 'config', dataclasses.replace(
+        weather_app.config, stream_content_threshold=len(WEATHER_FILE) - 1
+    ))
+    monkeypatch.setattr(weather_app, 'STREAM_CHUNK_SIZE', 16)
+    bucket.objects['weather.json'] = WEATHER_FILE
+    
+    response = client.get('/weather-file-content/weather.json')
+    assert response.status_code == 200
+    assert response.is_streamed
+    assert orjson.loads(response.data) == {'filename': 'weather.json', 'data': orjson.loads(WEATHER_FILE)}
+    assert bucket.calls == [('open', 'weather.json')]
+
+
+def test_weather_file_content_parses_small_files(client, bucket):
+    bucket.objects['weather.json'] = WEATHER_FILE
+    
+    response = client.get('/weather-file-content/weather.json')
+    assert response.status_code == 200
+    assert response.get_json() == {'filename': 'weather.json', 'data': orjson.loads(WEATHER_FILE)}
+    assert bucket.calls == [('download', 'weather.json')]
+
+
+def test_weather_file_content_missing_file(client, bucket):
+    response = client.get('/weather-file-content/missing.json')
+    assert response.status_code == 404
+    assert response.get_json() == {'error': 'File not found'}
+
+
+def test_list_weather_files_returns_one_page(client, monkeypatch, bucket):
+    created = datetime(2024, 11, 23, 14, 30, 22, tzinfo=timezone.utc)
+    listed = [
+        SimpleNamespace(name=f'weather_{index}.json', size=1024, time_created=created, updated=created)
+        for index in range(2)
+    ]
+    requests_made = []
+    
+    def list_blobs(**kwargs):
+        requests_made.append(kwargs)
+        return SimpleNamespace(pages=iter([listed]), next_page_token='next-token')
+    
+    monkeypatch.setattr(bucket, 'list_blobs', list_blobs, raising=False)
+    
+    response = client.get('/list-weather-files?limit=2&page_token=abc')
+    assert response.status_code == 200
+    assert response.get_json() == {
+        'files': [
+            {
+                'filename': f'weather_{index}.json',
+                'size': 1024,
+                'created': '2024-11-23T14:30:22+00:00',
+                'updated': '2024-11-23T14:30:22+00:00'
+            }
+            for index in range(2)
+        ],
+        'count': 2,
+        'next_page_token': 'next-token'
+    }
+    assert requests_made == [{
+        'max_results': 2,
+        'page_token': 'abc',
+        'delimiter': '/',
+        'fields': 'items(name,size,timeCreated,updated),nextPageToken'
+    }]
+
+
+@pytest.mark.parametrize('limit', ['abc', '0', '1001'])
+def test_list_weather_files_rejects_invalid_limit(client, bucket, limit):
+    response = client.get(f'/list-weather-files?limit={limit}')
+    assert response.status_code == 400